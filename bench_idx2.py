@@ -0,0 +1,170 @@
+"""针对本地模拟IDX服务运行idx2.run()的端到端延迟基准测试
+
+每个场景启动一个mock_idx_server.MockIdxServer，用带登录cookie的storage state
+重复执行run()，统计端到端耗时和各阶段（idx2.phase记录的span）耗时的p50/p95。
+显示Terms对话框的场景还要求每次运行都真正提交了Terms（以模拟服务收到的提交为准），
+快速刷新场景的storage state带有已过期的工作站JWT，要求每次都由快速刷新拿到新JWT，
+否则该次运行记为失败。
+
+用法:
+    python bench_idx2.py                          # 运行全部场景
+    python bench_idx2.py --scenario terms -n 5    # 只运行terms场景5次
+    python bench_idx2.py --json bench.json        # 同时把结果写入JSON文件
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+from playwright.async_api import async_playwright
+
+import idx2
+from mock_idx_server import WORKSTATION_HOST, MockIdxServer, make_jwt
+
+# 场景名 -> MockIdxServer配置
+SCENARIOS = {
+    "fast": {"ide_render_delay": 1.0},
+    "terms": {"ide_render_delay": 1.0, "terms_dialog": True},
+    "late_terms": {"ide_render_delay": 1.0, "terms_dialog": True, "terms_delay": 3.0},
+    "slow_ide": {"ide_render_delay": 15.0},
+    "slow_dashboard": {"ide_render_delay": 1.0, "dashboard_delay": 3.0},
+    "flaky": {"ide_render_delay": 1.0, "fail_rate": 0.2},
+    "fast_refresh": {"ide_render_delay": 1.0},
+}
+# 每次运行都必须提交Terms对话框的场景
+TERMS_SCENARIOS = {"terms", "late_terms"}
+# storage state带有已过期工作站JWT、每次运行都必须由快速刷新完成的场景
+FAST_REFRESH_SCENARIOS = {"fast_refresh"}
+
+
+def percentile(values, pct):
+    """最近秩法计算百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def phase_totals(spans):
+    """把一次运行的span按阶段名累加，不含attempt_*本身"""
+    totals = {}
+    for span in spans:
+        if span["phase"].startswith("attempt_"):
+            continue
+        totals[span["phase"]] = totals.get(span["phase"], 0) + span["duration"]
+    return totals
+
+
+async def run_once(server, workdir, iteration, expect_terms=False, expect_fast_refresh=False):
+    """执行一次run()，返回 (是否成功, 端到端耗时, 阶段耗时, 尝试次数)
+
+    expect_terms为True时，本次运行没有提交Terms对话框也记为失败；expect_fast_refresh为True时
+    storage state带有已过期的工作站JWT，没有由快速刷新完成也记为失败。
+    """
+    state_path = os.path.join(workdir, f"state_{iteration}.json")
+    if expect_fast_refresh:
+        state = server.workstation_storage_state(make_jwt(WORKSTATION_HOST.split("-", 1)[1], -60))
+    else:
+        state = server.login_storage_state()
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+    log = idx2.RunLog(jsonl_path=None)
+    token = idx2.run_log.set(log)
+    terms_before = server.terms_submitted
+    started = time.monotonic()
+    try:
+        async with async_playwright() as playwright:
+            success = await idx2.run(playwright, state_path)
+    except Exception as e:
+        print(f"  第{iteration}次运行出错: {e}")
+        success = False
+    finally:
+        elapsed = time.monotonic() - started
+        idx2.run_log.reset(token)
+    if expect_terms and success and server.terms_submitted == terms_before:
+        print(f"  第{iteration}次运行没有提交Terms对话框")
+        success = False
+    if expect_fast_refresh and success and not any(
+        span["phase"] == "fast_refresh" and span["ok"] for span in log.spans
+    ):
+        print(f"  第{iteration}次运行没有由快速刷新完成")
+        success = False
+    attempts = sum(1 for span in log.spans if span["phase"].startswith("attempt_"))
+    return success, elapsed, phase_totals(log.spans), attempts
+
+
+async def run_scenario(name, config, iterations, workdir):
+    """运行一个场景的所有迭代并汇总"""
+    results = []
+    with MockIdxServer(**config) as server:
+        idx2.app_url = server.dashboard_url
+        idx2.WORKSTATION_URL_TEMPLATE = f"http://{{domain}}:{server.port}/"
+        for iteration in range(1, iterations + 1):
+            success, elapsed, phases, attempts = await run_once(
+                server, workdir, iteration,
+                expect_terms=name in TERMS_SCENARIOS,
+                expect_fast_refresh=name in FAST_REFRESH_SCENARIOS,
+            )
+            print(f"  [{name}] 第{iteration}/{iterations}次: {'成功' if success else '失败'}，"
+                  f"{elapsed:.2f}秒，尝试{attempts}次")
+            results.append({"success": success, "elapsed": elapsed, "phases": phases, "attempts": attempts})
+
+    durations = [r["elapsed"] for r in results]
+    phase_names = sorted({phase for r in results for phase in r["phases"]})
+    return {
+        "scenario": name,
+        "config": config,
+        "iterations": iterations,
+        "success_rate": sum(r["success"] for r in results) / len(results),
+        "e2e_p50": percentile(durations, 50),
+        "e2e_p95": percentile(durations, 95),
+        "phases": {
+            phase: {
+                "p50": percentile([r["phases"].get(phase, 0) for r in results], 50),
+                "p95": percentile([r["phases"].get(phase, 0) for r in results], 95),
+            }
+            for phase in phase_names
+        },
+        "runs": results,
+    }
+
+
+def print_report(summaries):
+    print("\n========== 基准测试结果 ==========")
+    for summary in summaries:
+        print(f"\n场景 {summary['scenario']}: 成功率{summary['success_rate']:.0%}，"
+              f"端到端 p50={summary['e2e_p50']:.2f}秒 p95={summary['e2e_p95']:.2f}秒")
+        for phase, stats in summary["phases"].items():
+            print(f"  {phase:<20} p50={stats['p50']:.3f}秒 p95={stats['p95']:.3f}秒")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="idx2.run()端到端延迟基准测试")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="要运行的场景，可重复指定，默认全部")
+    parser.add_argument("-n", "--iterations", type=int, default=3, help="每个场景的运行次数")
+    parser.add_argument("--json", help="把结果写入指定的JSON文件")
+    args = parser.parse_args()
+
+    names = args.scenario or list(SCENARIOS)
+    summaries = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names:
+            print(f"运行场景 {name}...")
+            summaries.append(await run_scenario(name, SCENARIOS[name], args.iterations, workdir))
+
+    print_report(summaries)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=2)
+    return 0 if all(s["success_rate"] == 1 for s in summaries) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
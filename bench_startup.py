@@ -0,0 +1,96 @@
+"""idx2.py启动开销基准测试：导入耗时和进程启动到完成第一次探测的耗时
+
+每次在新的Python进程中导入idx2并对本地模拟服务发起一次工作站探测（与probe子命令
+相同的代码路径），统计多次运行的中位数；超过预算，或健康检查路径导入了Playwright时
+以非0退出码结束。定时任务的每次执行都要付出这部分开销。
+
+用法:
+    python bench_startup.py                                  # 默认预算
+    python bench_startup.py -n 10 --import-budget 0.2 --probe-budget 0.8
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_idx_server import MockIdxServer, make_jwt
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 在子进程中执行：计时导入idx2，再探测一次工作站
+CHILD_SCRIPT = """
+import json, os, sys, time
+sys.path.insert(0, os.environ["BENCH_REPO_DIR"])
+started = time.perf_counter()
+import idx2
+import_seconds = time.perf_counter() - started
+import asyncio
+results = asyncio.run(idx2.probe_workstations([(os.environ["BENCH_URL"], os.environ["BENCH_JWT"])]))
+print(json.dumps({
+    "import": import_seconds,
+    "first_probe": time.time() - float(os.environ["BENCH_SPAWN_TIME"]),
+    "state": results[0]["state"],
+    "playwright_loaded": any(name.startswith("playwright") for name in sys.modules),
+}))
+"""
+
+
+def run_once(url, jwt, workdir):
+    """在新进程中执行一次，返回子进程报告的计时"""
+    env = dict(
+        os.environ,
+        BENCH_REPO_DIR=REPO_DIR,
+        BENCH_URL=url,
+        BENCH_JWT=jwt,
+        BENCH_SPAWN_TIME=repr(time.time()),
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="idx2.py启动开销基准测试")
+    parser.add_argument("-n", "--iterations", type=int, default=5, help="运行次数")
+    parser.add_argument("--import-budget", type=float, default=0.25, help="导入idx2的预算（秒，中位数）")
+    parser.add_argument("--probe-budget", type=float, default=1.0, help="进程启动到完成第一次探测的预算（秒，中位数）")
+    args = parser.parse_args()
+
+    runs = []
+    with MockIdxServer(require_login=False) as server, tempfile.TemporaryDirectory() as workdir:
+        url = f"http://127.0.0.1:{server.port}/"
+        jwt = make_jwt("mock", 3600)
+        for iteration in range(1, args.iterations + 1):
+            run = run_once(url, jwt, workdir)
+            print(f"  第{iteration}/{args.iterations}次: 导入{run['import']:.3f}秒，"
+                  f"首次探测{run['first_probe']:.3f}秒，状态{run['state']}")
+            runs.append(run)
+
+    import_median = statistics.median(r["import"] for r in runs)
+    probe_median = statistics.median(r["first_probe"] for r in runs)
+    print("\n========== 启动开销 ==========")
+    print(f"导入idx2: 中位数{import_median:.3f}秒（预算{args.import_budget}秒）")
+    print(f"首次探测: 中位数{probe_median:.3f}秒（预算{args.probe_budget}秒）")
+
+    failures = []
+    if import_median > args.import_budget:
+        failures.append("导入耗时超出预算")
+    if probe_median > args.probe_budget:
+        failures.append("首次探测耗时超出预算")
+    if any(r["playwright_loaded"] for r in runs):
+        failures.append("健康检查路径导入了Playwright")
+    if any(r["state"] != "ready" for r in runs):
+        failures.append("探测结果不是ready")
+    for failure in failures:
+        print(f"失败: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""针对本地模拟Bot API检查idx2.TelegramNotifier的发送路径
+
+用mock_idx_server.MockIdxServer的sendMessage替身（telegram_status配置状态码）检查：
+- 合并：窗口内提交的多份报告合并为一条消息
+- 拆分：超过TELEGRAM_MAX_LENGTH的报告按行拆成多条消息，内容不丢失
+- 429：按响应中的retry_after重试，而不是默认的退避间隔
+- 4xx：令牌或chat_id错误时丢弃本批报告，不重试
+- 发件箱：未送达的报告写入发件箱文件，重启（新的通知器实例）后继续发送
+
+任一检查不通过时以非0退出码结束。
+
+用法:
+    python check_notify.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import idx2
+from mock_idx_server import MockIdxServer
+
+
+def make_notifier(server, outbox_path, window=0.5):
+    return idx2.TelegramNotifier(
+        "mock-token", "mock-chat", outbox_path=outbox_path, window=window, api_base=server.telegram_api_base,
+    )
+
+
+async def wait_until(predicate, timeout):
+    """轮询直到predicate()为真，超时返回False"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+
+async def check_coalescing(workdir):
+    failures = []
+    with MockIdxServer() as server:
+        notifier = make_notifier(server, os.path.join(workdir, "outbox_coalesce.json"))
+        for index in range(3):
+            notifier.submit(f"报告{index}")
+        if not await wait_until(lambda: not notifier.pending, 5):
+            failures.append("合并: 报告没有在窗口结束后送达")
+        messages = server.telegram_messages
+        print(f"  [合并] 提交3份报告，收到{len(messages)}条消息")
+        if len(messages) != 1:
+            failures.append(f"合并: 期望1条消息，实际{len(messages)}条")
+        elif not all(f"报告{index}" in messages[0]["text"] for index in range(3)):
+            failures.append("合并: 消息没有包含全部报告")
+    return failures
+
+
+async def check_long_report(workdir):
+    failures = []
+    # 模拟40个账号的fleet报告，汇总行在最后
+    lines = [f"[12:00:{index % 60:02d}] fleet账号结果 account{index:02d}@example.com: refreshed，耗时{index}.5秒，"
+             f"错误: {'x' * 60}" for index in range(40)]
+    lines.append("fleet模式执行完成: 40/40个账号正常")
+    report = "\n".join(lines)
+    with MockIdxServer() as server:
+        notifier = make_notifier(server, os.path.join(workdir, "outbox_long.json"))
+        notifier.submit(report)
+        await notifier.flush(timeout=5)
+        messages = [m["text"] for m in server.telegram_messages]
+        print(f"  [拆分] {len(report)}字符的报告拆成{len(messages)}条消息")
+        if len(messages) < 2:
+            failures.append(f"拆分: 期望多条消息，实际{len(messages)}条")
+        if any(len(text) > idx2.TELEGRAM_MAX_LENGTH for text in messages):
+            failures.append("拆分: 有消息超过TELEGRAM_MAX_LENGTH")
+        received = [line for text in messages for line in text.split("\n")[1:]]
+        if received != lines:
+            failures.append("拆分: 拼接后的内容与原报告不一致（行被切断或丢失）")
+    return failures
+
+
+async def check_retry_after(workdir):
+    failures = []
+    with MockIdxServer(telegram_status=429) as server:
+        notifier = make_notifier(server, os.path.join(workdir, "outbox_429.json"))
+        notifier.submit("限流报告")
+        flush = asyncio.ensure_future(notifier.flush(timeout=10))
+        await wait_until(lambda: server.telegram_attempts >= 1, 5)
+        rejected_at = time.monotonic()
+        server.config["telegram_status"] = 200
+        await flush
+        waited = time.monotonic() - rejected_at
+        print(f"  [429] 第{server.telegram_attempts}次请求送达，限流后等待{waited:.1f}秒")
+        if len(server.telegram_messages) != 1:
+            failures.append("429: 报告没有在重试后送达")
+        # 模拟服务返回retry_after=1，应明显早于默认退避间隔
+        if not 0.8 <= waited < idx2.NOTIFY_RETRY_INITIAL:
+            failures.append(f"429: 没有按retry_after重试（等待{waited:.1f}秒）")
+    return failures
+
+
+async def check_drop_on_4xx(workdir):
+    failures = []
+    outbox_path = os.path.join(workdir, "outbox_400.json")
+    with MockIdxServer(telegram_status=400) as server:
+        notifier = make_notifier(server, outbox_path)
+        notifier.submit("无效令牌的报告")
+        await notifier.flush(timeout=5)
+        print(f"  [4xx] 请求{server.telegram_attempts}次，发件箱剩余{len(notifier.pending)}份")
+        if server.telegram_attempts != 1:
+            failures.append(f"4xx: 期望只请求1次，实际{server.telegram_attempts}次")
+        if notifier.pending or os.path.exists(outbox_path):
+            failures.append("4xx: 被拒绝的报告没有从发件箱丢弃")
+    return failures
+
+
+def check_outbox_restart(workdir):
+    failures = []
+    outbox_path = os.path.join(workdir, "outbox_restart.json")
+    with MockIdxServer(telegram_status=500) as server:
+        first = make_notifier(server, outbox_path)
+
+        async def first_run():
+            first.submit("上次未送达的报告")
+            await first.flush(timeout=0.5)
+
+        asyncio.run(first_run())
+        if not os.path.exists(outbox_path):
+            failures.append("发件箱: 未送达的报告没有写入发件箱文件")
+
+        # 新的事件循环和通知器实例相当于下一次运行
+        server.config["telegram_status"] = 200
+        second = make_notifier(server, outbox_path)
+        restored = len(second.pending)
+        asyncio.run(second.flush(timeout=5))
+        print(f"  [发件箱] 重启后恢复{restored}份报告，送达{len(server.telegram_messages)}条消息")
+        if restored != 1:
+            failures.append(f"发件箱: 重启后期望恢复1份报告，实际{restored}份")
+        if not any("上次未送达的报告" in m["text"] for m in server.telegram_messages):
+            failures.append("发件箱: 重启后没有送达上次的报告")
+        if os.path.exists(outbox_path):
+            failures.append("发件箱: 送达后发件箱文件没有删除")
+    return failures
+
+
+def main():
+    idx2.run_log.set(idx2.RunLog(jsonl_path=None))
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for check in (check_coalescing, check_long_report, check_retry_after, check_drop_on_4xx):
+            failures += asyncio.run(check(workdir))
+        failures += check_outbox_restart(workdir)
+
+    for failure in failures:
+        print(f"失败: {failure}")
+    if not failures:
+        print("全部检查通过")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
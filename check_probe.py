@@ -0,0 +1,101 @@
+"""针对本地模拟IDX服务检查idx2.check_page_status()的工作站探测
+
+用mock_idx_server.MockIdxServer生成带工作站JWT的cookie文件，走与定时任务相同的
+cookie -> 工作站URL -> HTTP探测路径，检查三种状态：
+- ready：工作站返回200
+- starting：工作站返回503
+- login-redirect：JWT已过期，工作站重定向到登录页
+
+每个场景还用同一份cookie执行一次轻量保活心跳（http_keepalive_tick），检查工作站可用时
+直接返回ok，否则把探测结果交给浏览器回退（这里替换为记录参数，不启动浏览器）。
+
+任一场景的状态不符时以非0退出码结束。
+
+用法:
+    python check_probe.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+import idx2
+from mock_idx_server import WORKSTATION_HOST, MockIdxServer, make_jwt
+
+# 场景名 -> (MockIdxServer配置, JWT有效秒数, 期望状态)
+SCENARIOS = {
+    "ready": ({}, 3600, "ready"),
+    "starting": ({"workstation_status": 503}, 3600, "starting"),
+    "login_redirect": ({"workstation_auth": True}, -60, "login-redirect"),
+}
+
+
+async def check_scenario(name, config, jwt_ttl, expected, workdir):
+    """运行一个场景，返回失败原因列表"""
+    failures = []
+    with MockIdxServer(**config) as server:
+        idx2.WORKSTATION_URL_TEMPLATE = f"http://{{domain}}:{server.port}/"
+        cookie_path = os.path.join(workdir, f"cookie_{name}.json")
+        jwt = make_jwt(WORKSTATION_HOST.split("-", 1)[1], jwt_ttl)
+        with open(cookie_path, "w", encoding="utf-8") as f:
+            json.dump(server.workstation_storage_state(jwt), f)
+
+        state = await idx2.probe_page_state(cookie_path)
+        ready = await idx2.check_page_status(cookie_path)
+        print(f"  [{name}] 状态{state}，check_page_status={ready}，模拟服务收到{server.request_count}个请求")
+        if state != expected:
+            failures.append(f"{name}: 期望状态{expected}，实际{state}")
+        if ready != (expected == "ready"):
+            failures.append(f"{name}: check_page_status返回{ready}")
+        if server.request_count == 0:
+            failures.append(f"{name}: 探测没有到达模拟服务")
+        failures += await check_tick(name, cookie_path, jwt_ttl, expected)
+    return failures
+
+
+async def check_tick(name, cookie_path, jwt_ttl, expected):
+    """用同一份cookie执行一次轻量保活心跳，返回失败原因列表"""
+    failures = []
+    fallbacks = []
+
+    async def fake_refresh(probe_state=None):
+        fallbacks.append(probe_state)
+        return "refreshed"
+
+    idx2.cookies_path = cookie_path
+    original = idx2.http_keepalive_refresh
+    idx2.http_keepalive_refresh = fake_refresh
+    try:
+        outcome = await idx2.http_keepalive_tick()
+    finally:
+        idx2.http_keepalive_refresh = original
+    # JWT即将过期时不探测，直接回退且不带探测结果
+    handoff = expected if jwt_ttl > idx2.JWT_REFRESH_MARGIN else None
+    print(f"  [{name}] 心跳结果{outcome}，浏览器回退{fallbacks}")
+    if expected == "ready":
+        if outcome != "ok" or fallbacks:
+            failures.append(f"{name}: 工作站可用时心跳应直接返回ok，实际{outcome}")
+    elif fallbacks != [handoff]:
+        failures.append(f"{name}: 心跳应以探测结果{handoff}回退一次浏览器流程，实际{fallbacks}")
+    return failures
+
+
+async def main():
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        idx2.PROBE_RESOLVE = "localhost=127.0.0.1"
+        idx2.JWT_VERIFY_STATE = os.path.join(workdir, "jwt_state.json")
+        idx2.run_log.set(idx2.RunLog(jsonl_path=None))
+        for name, (config, jwt_ttl, expected) in SCENARIOS.items():
+            failures += await check_scenario(name, config, jwt_ttl, expected, workdir)
+
+    for failure in failures:
+        print(f"失败: {failure}")
+    if not failures:
+        print("全部场景通过")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,383 @@
+"""本地模拟IDX服务，用于离线测试和基准测试idx2.py的流程
+
+模拟脚本依赖的各个部分：
+- idx.google.com仪表盘：.workspace-icon工作区图标，可选的Terms对话框
+  （#utos-checkbox、#marketing-checkbox、#submit-button），提交时向服务端报告，计入terms_submitted
+- 工作站域名：设置WorkstationJwtPartitioned cookie
+- IDE页面：codicon侧边栏位于iframe内，按配置延迟渲染
+- Telegram Bot API的sendMessage：记录收到的消息和请求次数（配合TELEGRAM_API_BASE使用）
+
+所有域名都是*.localhost的子域名，Chromium会直接解析到本机。服务按Host头区分仪表盘和工作站。
+requests无法解析*.localhost，idx2的HTTP探测需设置 PROBE_RESOLVE=localhost=127.0.0.1，
+并用 WORKSTATION_URL_TEMPLATE=http://{domain}:<端口> 让cookie中的域名指向本服务。
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DASHBOARD_HOST = "idx.localhost"
+WORKSTATION_HOST = "9000-firebase-xxx-mock.cluster-mock.cloudworkstations.localhost"
+LOGIN_COOKIE = "SID"
+
+DEFAULT_CONFIG = {
+    "dashboard_delay": 0.0,  # 仪表盘响应延迟（秒）
+    "workstation_delay": 0.0,  # 工作站页面响应延迟（秒）
+    "ide_render_delay": 2.0,  # IDE侧边栏在iframe中渲染前的延迟（秒）
+    "terms_dialog": False,  # 仪表盘是否显示Terms对话框
+    "terms_delay": 0.0,  # Terms对话框延迟出现的秒数
+    "require_login": True,  # 没有登录cookie时重定向到signin页面
+    "fail_rate": 0.0,  # 随机返回500的比例
+    "workstation_status": 200,  # 工作站根路径的状态码，503表示正在启动
+    "workstation_auth": False,  # 工作站根路径要求未过期的WorkstationJwtPartitioned，否则重定向到登录页
+    "jwt_ttl": 3600,  # 签发的JWT有效秒数
+    "telegram_status": 200,  # sendMessage的状态码，429/500用于测试重试
+}
+
+
+def make_jwt(audience, ttl):
+    """生成结构与真实WorkstationJwtPartitioned一致的JWT（签名无效）"""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    now = int(time.time())
+    header = encode({"alg": "RS256", "typ": "JWT"})
+    payload = encode({
+        "iss": "https://cloud.google.com/workstations",
+        "aud": audience,
+        "iat": now,
+        "exp": now + ttl,
+    })
+    return f"{header}.{payload}.mock-signature"
+
+
+def jwt_expired(jwt):
+    """按exp判断make_jwt()生成的JWT是否已过期，无法解析的视为过期"""
+    try:
+        payload = jwt.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return claims["exp"] <= time.time()
+    except (IndexError, KeyError, ValueError):
+        return True
+
+
+DASHBOARD_PAGE = """<!DOCTYPE html>
+<html><head><title>Firebase Studio</title>
+<link rel="icon" href="https://www.gstatic.com/monospace/favicon.ico"></head>
+<body>
+<div class="workspace-list">
+  <div class="workspace-icon" onclick="location.href='__WORKSTATION_URL__'">
+    <img role="presentation" class="custom-icon" src="https://www.gstatic.com/monospace/250314/workspace-blank-192.png">
+  </div>
+</div>
+__TERMS__
+</body></html>
+"""
+
+TERMS_DIALOG = """<script>
+setTimeout(() => {
+  const dialog = document.createElement('div');
+  dialog.id = 'terms-dialog';
+  dialog.innerHTML = `
+    <label class="basic-checkbox-label"><input type="checkbox" id="utos-checkbox" class="ng-invalid"> Terms</label>
+    <label class="basic-checkbox-label"><input type="checkbox" id="marketing-checkbox" class="ng-invalid"> News</label>
+    <button id="submit-button" disabled>Confirm</button>`;
+  document.body.appendChild(dialog);
+  const utos = document.getElementById('utos-checkbox');
+  const button = document.getElementById('submit-button');
+  utos.addEventListener('change', () => { button.disabled = !utos.checked; });
+  button.addEventListener('click', () => {
+    document.cookie = 'terms_accepted=1; path=/';
+    navigator.sendBeacon('/terms/accept');
+    dialog.remove();
+  });
+}, __TERMS_DELAY_MS__);
+</script>"""
+
+WORKSTATION_PAGE = """<!DOCTYPE html>
+<html><head><title>Code OSS</title></head>
+<body style="margin:0">
+<iframe src="/ide" style="width:100%;height:100vh;border:0"></iframe>
+</body></html>
+"""
+
+IDE_PAGE = """<!DOCTYPE html>
+<html><head><title>workbench</title></head>
+<body>
+<div class="monaco-workbench">loading</div>
+<script>
+setTimeout(() => {
+  document.querySelector('.monaco-workbench').innerHTML = `
+    <ul class="actions-container">
+      <li><a class="codicon codicon-explorer-view-icon" aria-label="Explorer"></a></li>
+      <li><a class="codicon codicon-search-view-icon" aria-label="Search"></a></li>
+      <li><a class="codicon codicon-source-control-view-icon" aria-label="Source Control"></a></li>
+      <li><a class="codicon codicon-run-view-icon" aria-label="Run and Debug"></a></li>
+    </ul>
+    <div aria-label="Web"><span class="tab-label-name">Web</span></div>`;
+}, __RENDER_DELAY_MS__);
+</script>
+</body></html>
+"""
+
+SIGNIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Sign in</title></head>
+<body><form><input type="email"><button>Next</button></form></body></html>
+"""
+
+
+class MockIdxHandler(BaseHTTPRequestHandler):
+    """按Host头分发仪表盘和工作站请求"""
+
+    server_version = "MockIdx/1.0"
+
+    def log_message(self, format, *args):
+        # 基准测试时不输出访问日志
+        pass
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def send_html(self, body, status=200, headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def cookies(self):
+        cookies = {}
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name:
+                cookies[name] = value
+        return cookies
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path == "/terms/accept":
+            self.server.terms_submitted += 1
+            self.send_response(204)
+            self.end_headers()
+            return
+        if not (path.startswith("/bot") and path.endswith("/sendMessage")):
+            self.send_html("<h1>Not Found</h1>", status=404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        self.server.telegram_attempts += 1
+        status = self.config["telegram_status"]
+        if status == 200:
+            self.server.telegram_messages.append({
+                "chat_id": form.get("chat_id", [""])[0],
+                "text": form.get("text", [""])[0],
+            })
+            body = {"ok": True, "result": {"message_id": len(self.server.telegram_messages)}}
+        elif status == 429:
+            body = {"ok": False, "error_code": 429, "parameters": {"retry_after": 1}}
+        else:
+            body = {"ok": False, "error_code": status}
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.server.request_count += 1
+        if random.random() < self.config["fail_rate"]:
+            self.send_html("<h1>Internal Server Error</h1>", status=500)
+            return
+
+        host = (self.headers.get("Host") or "").split(":")[0]
+        if host == WORKSTATION_HOST:
+            self.handle_workstation()
+        else:
+            self.handle_dashboard()
+
+    def handle_dashboard(self):
+        path = urlparse(self.path).path
+        if path.startswith("/signin"):
+            self.send_html(SIGNIN_PAGE)
+            return
+        if self.config["require_login"] and LOGIN_COOKIE not in self.cookies():
+            self.send_response(302)
+            self.send_header("Location", f"/signin?continue={self.server.dashboard_url}")
+            self.end_headers()
+            return
+
+        time.sleep(self.config["dashboard_delay"])
+        terms = ""
+        if self.config["terms_dialog"] and "terms_accepted" not in self.cookies():
+            terms = TERMS_DIALOG.replace("__TERMS_DELAY_MS__", str(int(self.config["terms_delay"] * 1000)))
+        body = (
+            DASHBOARD_PAGE
+            .replace("__WORKSTATION_URL__", self.server.workstation_url)
+            .replace("__TERMS__", terms)
+        )
+        self.send_html(body)
+
+    def handle_workstation(self):
+        path = urlparse(self.path).path
+        if path == "/ide":
+            delay_ms = int(self.config["ide_render_delay"] * 1000)
+            self.send_html(IDE_PAGE.replace("__RENDER_DELAY_MS__", str(delay_ms)))
+            return
+        if path == "/_workstation/login":
+            self.send_html(SIGNIN_PAGE)
+            return
+        if self.config["workstation_auth"] and jwt_expired(self.cookies().get("WorkstationJwtPartitioned", "")):
+            self.send_response(302)
+            self.send_header("Location", "/_workstation/login?redirect=%2F")
+            self.end_headers()
+            return
+
+        time.sleep(self.config["workstation_delay"])
+        status = self.config["workstation_status"]
+        if status != 200:
+            self.send_html("<h1>Workstation is starting</h1>", status=status)
+            return
+        jwt = make_jwt(WORKSTATION_HOST.split("-", 1)[1], self.config["jwt_ttl"])
+        self.send_html(WORKSTATION_PAGE, headers={
+            "Set-Cookie": f"WorkstationJwtPartitioned={jwt}; Path=/; HttpOnly",
+        })
+
+
+class MockIdxServer:
+    """在后台线程中运行的模拟IDX服务"""
+
+    def __init__(self, host="127.0.0.1", port=0, **config):
+        unknown = set(config) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"未知的配置项: {', '.join(sorted(unknown))}")
+        self.httpd = ThreadingHTTPServer((host, port), MockIdxHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.config = dict(DEFAULT_CONFIG, **config)
+        self.httpd.request_count = 0
+        self.httpd.telegram_messages = []
+        self.httpd.telegram_attempts = 0
+        self.httpd.terms_submitted = 0
+        self.port = self.httpd.server_address[1]
+        self.httpd.dashboard_url = self.dashboard_url
+        self.httpd.workstation_url = self.workstation_url
+        self._thread = None
+
+    @property
+    def dashboard_url(self):
+        return f"http://{DASHBOARD_HOST}:{self.port}/"
+
+    @property
+    def workstation_url(self):
+        return f"http://{WORKSTATION_HOST}:{self.port}/"
+
+    @property
+    def telegram_api_base(self):
+        """Bot API替身的地址，设置为TELEGRAM_API_BASE"""
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def telegram_messages(self):
+        return self.httpd.telegram_messages
+
+    @property
+    def telegram_attempts(self):
+        """收到的sendMessage请求数，包括返回错误的"""
+        return self.httpd.telegram_attempts
+
+    @property
+    def terms_submitted(self):
+        """Terms对话框被提交的次数"""
+        return self.httpd.terms_submitted
+
+    @property
+    def config(self):
+        return self.httpd.config
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    def login_storage_state(self):
+        """返回带登录cookie的storage state，相当于已登录账号的cookie.json"""
+        return {
+            "cookies": [{
+                "name": LOGIN_COOKIE,
+                "value": "mock-session",
+                "domain": DASHBOARD_HOST,
+                "path": "/",
+                "expires": time.time() + 86400,
+                "httpOnly": True,
+                "secure": False,
+                "sameSite": "Lax",
+            }],
+            "origins": [],
+        }
+
+    def workstation_storage_state(self, jwt=None):
+        """返回带工作站JWT的storage state，jwt默认为一个新签发的有效token"""
+        jwt = jwt or make_jwt(WORKSTATION_HOST.split("-", 1)[1], self.config["jwt_ttl"])
+        state = self.login_storage_state()
+        state["cookies"].append({
+            "name": "WorkstationJwtPartitioned",
+            "value": jwt,
+            "domain": WORKSTATION_HOST,
+            "path": "/",
+            "expires": time.time() + 86400,
+            "httpOnly": True,
+            "secure": False,
+            "sameSite": "Lax",
+        })
+        return state
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟IDX服务")
+    parser.add_argument("--port", type=int, default=8765)
+    for name, default in DEFAULT_CONFIG.items():
+        option = f"--{name.replace('_', '-')}"
+        if isinstance(default, bool):
+            parser.add_argument(option, type=lambda v: v.lower() in ("1", "true", "yes"), default=default)
+        else:
+            parser.add_argument(option, type=type(default), default=default)
+    args = vars(parser.parse_args())
+    port = args.pop("port")
+
+    server = MockIdxServer(port=port, **args)
+    print(f"仪表盘: {server.dashboard_url}")
+    print(f"工作站: {server.workstation_url}")
+    print(f"Telegram Bot API: {server.telegram_api_base}")
+    print(f"登录cookie: {json.dumps(server.login_storage_state())}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()